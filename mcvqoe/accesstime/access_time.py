@@ -3,7 +3,6 @@ import csv
 import datetime
 import mcvqoe.base
 import os
-import pkg_resources
 import pickle
 import re
 import scipy.interpolate
@@ -14,13 +13,16 @@ import time
 import timeit
 
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from fractions import Fraction
+from importlib import resources
 from mcvqoe.base.terminal_user import terminal_progress_update, terminal_user_check
 from mcvqoe.delay.ITS_delay import active_speech_level
 from mcvqoe.math import approx_permutation_test
 from .version import version
 
 import numpy as np
+import pandas as pd
 
 
 def chans_to_string(chans):
@@ -28,6 +30,20 @@ def chans_to_string(chans):
     return '('+(';'.join(chans))+')'
 
 
+def _link_or_copy(src, dst):
+    '''
+    Hard link src to dst, copying instead if a link can not be made.
+
+    This should only be used for files that will not be modified after they
+    are linked, as changes would show up in both files.
+    '''
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Different filesystem, links not supported, etc. Just copy
+        shutil.copyfile(src, dst)
+
+
 # Generate filter for PTT signal
 # NOTE: this relies on fs being fixed!
 # Calculate niquest frequency
@@ -36,6 +52,136 @@ fn = abcmrt.fs/2
 # Create lowpass filter for PTT signal processing
 ptt_filt = scipy.signal.firwin(400, 200/fn, pass_zero='lowpass')
 
+# Compile patterns once here instead of on every call
+# Matches indexed format fields (e.g. 'name[1]')
+field_index_re = re.compile(r'(?P<name>.+)\[(?P<index>\d+)\]')
+# Matches lines in the top section of data .csv files
+csv_top_re = re.compile(r'(?:\s*(?P<var>\w+)\s*=\s*(?P<val>\S+))|(?P<sep>-{4,})')
+# Matches recorded audio file names, giving trial number and clip name
+rec_audio_re = re.compile(r'(?:Rx(?P<rx>\d+)|Bad(?P<bad>\d+)_r\d+)_(?P<clip>.+)\.wav')
+
+
+def _clip_names(audio_files):
+    '''
+    Get clip names, without path or extension, from audio file names.
+    '''
+    return [os.path.basename(os.path.splitext(f)[0]) for f in audio_files]
+
+
+def _read_clip(f_full):
+    '''
+    Read a clip and its cutpoints.
+
+    Returns the cutpoint file name, sample rate, audio and cutpoints.
+    '''
+    # Load audio
+    fs_file, audio_dat = mcvqoe.base.audio_read(f_full)
+    # Strip extension from file
+    fne, _ = os.path.splitext(f_full)
+    # Add .csv extension
+    fcsv = fne+'.csv'
+    # Load cutpoints
+    cp = mcvqoe.base.load_cp(fcsv)
+
+    return fcsv, fs_file, audio_dat, cp
+
+
+def _save_recovery_audio(fname, y, cutpoints):
+    '''
+    Save clip audio and cutpoints to a .npz file for recovery.
+
+    Cutpoints are stored as an array with columns Clip, Start and End.
+    '''
+    arrays = {}
+    for n, (dat, cp) in enumerate(zip(y, cutpoints)):
+        arrays[f'y{n}'] = dat
+        arrays[f'cp{n}'] = np.array([(w['Clip'], w['Start'], w['End']) for w in cp], dtype=float)
+
+    np.savez(fname, **arrays)
+
+
+def _load_recovery_audio(fname):
+    '''
+    Load clip audio and cutpoints saved with _save_recovery_audio.
+
+    Cutpoints are returned in the same form as mcvqoe.base.load_cp.
+
+    Raises
+    ------
+    RuntimeError
+        If fname can not be found.
+    '''
+    try:
+        npz = np.load(fname)
+    except FileNotFoundError as err:
+        raise RuntimeError(f'Recovery audio file \'{fname}\' not found') from err
+
+    with npz:
+        n_clips = len(npz.files)//2
+        y = [npz[f'y{n}'] for n in range(n_clips)]
+        cutpoints = []
+        for n in range(n_clips):
+            cp = []
+            for clip, start, end in npz[f'cp{n}']:
+                cp.append({
+                        # NaN clips are silence, others are word numbers
+                        'Clip'  : float(clip) if np.isnan(clip) else int(clip),
+                        'Start' : int(start),
+                        'End'   : int(end),
+                    })
+            cutpoints.append(tuple(cp))
+
+    return y, cutpoints
+
+
+def _apply_ptt_filter(x):
+    '''
+    Zero phase filter a signal with ptt_filt.
+
+    This matches scipy.signal.filtfilt(ptt_filt, 1, x), to within floating
+    point rounding. For long signals overlap-add convolution is used,
+    filtfilt does a direct convolution which is slow with this many taps.
+    Filtering is always done in (at least) double precision.
+
+    Parameters
+    ----------
+    x : numpy vector
+        Signal to filter.
+
+    Returns
+    -------
+    numpy vector
+        Filtered signal, float64 for real input.
+    '''
+    ntaps = len(ptt_filt)
+
+    # Short signals, direct convolution is fine
+    if len(x) <= 8*ntaps:
+        return scipy.signal.filtfilt(ptt_filt, 1, x)
+
+    padlen = 3*ntaps
+    # Filter input is the first sample repeated ntaps-1 times, this gives the
+    # same steady state initial conditions that filtfilt uses, followed by
+    # the extended signal. Both passes share this buffer
+    pre = ntaps - 1
+    buf = np.empty(pre + len(x) + 2*padlen, dtype=np.result_type(x, np.float64))
+
+    # Pad with an odd extension, same as filtfilt
+    buf[pre:pre+padlen] = 2*x[0] - x[padlen:0:-1]
+    buf[pre+padlen:-padlen] = x
+    buf[-padlen:] = 2*x[-1] - x[-2:-(padlen+2):-1]
+
+    # Forward pass
+    buf[:pre] = buf[pre]
+    ext = scipy.signal.oaconvolve(buf, ptt_filt, mode='valid')
+
+    # Backward pass, on the time reversed output of the forward pass
+    buf[pre:] = ext[::-1]
+    buf[:pre] = buf[pre]
+    ext = scipy.signal.oaconvolve(buf, ptt_filt, mode='valid')[::-1]
+
+    return ext[padlen:-padlen]
+
 
 class measure(mcvqoe.base.Measure):
     """
@@ -150,7 +296,7 @@ class measure(mcvqoe.base.Measure):
     param_check()
         TODO
     load_dat()
-        Load test specific csv data into dictionary in order to recover errant test
+        Load test specific csv data into a record array in order to recover errant test
 
     Examples
     --------
@@ -236,19 +382,13 @@ class measure(mcvqoe.base.Measure):
 
     def __init__(self, **kwargs):
 
+        # Find the included audio once for all default clips
+        clip_path = self.included_audio_path()
         self.audio_files = [
-            pkg_resources.resource_filename(
-                "mcvqoe.accesstime", "audio_clips/F1_b9_w1_bed.wav"
-                ),
-            pkg_resources.resource_filename(
-                "mcvqoe.accesstime", "audio_clips/F3_b31_w2_law.wav"
-                ),
-            pkg_resources.resource_filename(
-                "mcvqoe.accesstime", "audio_clips/M3_b38_w1_hang.wav"
-                ),
-            pkg_resources.resource_filename(
-                "mcvqoe.accesstime", "audio_clips/M4_b14_w1_not.wav"
-                )
+            os.path.join(clip_path, "F1_b9_w1_bed.wav"),
+            os.path.join(clip_path, "F3_b31_w2_law.wav"),
+            os.path.join(clip_path, "M3_b38_w1_hang.wav"),
+            os.path.join(clip_path, "M4_b14_w1_not.wav"),
             ]
         self.audio_path = ""
         self.audio_interface = None
@@ -281,6 +421,10 @@ class measure(mcvqoe.base.Measure):
         self.save_tx_audio = True
         self.save_audio = True
         self.zip_audio = True
+        # Resampled background noise and level, filled in by load_audio
+        self._bgnoise_cache = None
+        # Clip names without path or extension, filled in by load_audio
+        self._clip_names = []
         # Variables for multiple iterations
         self.iterations = 1
         self.data_dirs = []
@@ -360,19 +504,36 @@ class measure(mcvqoe.base.Measure):
         self.cutpoints = []
         # List for word spacing
         self.inter_word_diff = 0.0
+        # Names of clips without path or extension
+        self._clip_names = _clip_names(self.audio_files)
         
         # If noise file was given, laod and resample to match audio files
         if (self.bgnoise_file):
-            nfs, nf = mcvqoe.base.audio_read(self.bgnoise_file)
-            rs = Fraction(abcmrt.fs/nfs)
-            nf = mcvqoe.base.audio_float(nf)
-            nf = scipy.signal.resample_poly(nf, rs.numerator, rs.denominator)
-        
-        for f in self.audio_files:
-            # Make full path from relative paths
-            f_full = os.path.join(self.audio_path, f)
-            # Load audio
-            fs_file, audio_dat = mcvqoe.base.audio_read(f_full)
+            # Key on name and modification time so changed files are reloaded
+            nf_key = (self.bgnoise_file, os.path.getmtime(self.bgnoise_file))
+            # Only load if we don't have this file from a previous call
+            if self._bgnoise_cache is None or self._bgnoise_cache[0] != nf_key:
+                nfs, nf = mcvqoe.base.audio_read(self.bgnoise_file)
+                rs = Fraction(abcmrt.fs/nfs)
+                nf = mcvqoe.base.audio_float(nf)
+                nf = scipy.signal.resample_poly(nf, rs.numerator, rs.denominator)
+                # Measure amplitude of noise, this is the same for all clips
+                noise_level = active_speech_level(nf, abcmrt.fs)
+                self._bgnoise_cache = (nf_key, nf, noise_level)
+            _, nf, noise_level = self._bgnoise_cache
+        
+        # Make full paths from relative paths
+        audio_full = [os.path.join(self.audio_path, f) for f in self.audio_files]
+
+        # Read audio and cutpoints for all clips concurrently, this is all
+        # file I/O so threads can overlap it
+        with ThreadPoolExecutor(max_workers=min(8, len(audio_full))) as ex:
+            clip_reads = [ex.submit(_read_clip, f_full) for f_full in audio_full]
+
+        for f, clip_read in zip(self.audio_files, clip_reads):
+            # Get results in clip order, read errors are raised here so they
+            # come after the checks for earlier clips
+            fcsv, fs_file, audio_dat, cp = clip_read.result()
             # Check fs
             if(fs_file != abcmrt.fs):
                 raise RuntimeError(f'Expected fs to be {abcmrt.fs} but got {fs_file} for {f}')
@@ -387,9 +548,8 @@ class measure(mcvqoe.base.Measure):
             # Add noise if given
             if self.bgnoise_file:
 
-                # Measure amplitude of signal and noise
+                # Measure amplitude of signal
                 sig_level = active_speech_level(audio_dat, abcmrt.fs)
-                noise_level = active_speech_level(nf, abcmrt.fs)
 
                 # Calculate noise gain required to get desired SNR
                 noise_gain = sig_level - (self.bgnoise_snr + noise_level)
@@ -397,17 +557,14 @@ class measure(mcvqoe.base.Measure):
                 # Set noise to the correct level
                 noise_scaled = nf * (10 ** (noise_gain / 20))
 
-                # Add noise (repeated to audio file size)
-                audio_dat = audio_dat + np.resize(noise_scaled, audio_dat.size)
+                # Add noise (repeated to audio file size) in place, one noise
+                # length at a time. audio_dat stays float32
+                for n_st in range(0, audio_dat.size, noise_scaled.size):
+                    audio_seg = audio_dat[n_st:n_st+noise_scaled.size]
+                    audio_seg += noise_scaled[:audio_seg.size]
 
             # Convert to float sound array and add to list
             self.y.append(audio_dat)
-            # Strip extension from file
-            fne, _ = os.path.splitext(f_full)
-            # Add .csv extension
-            fcsv = fne+'.csv'
-            # Load cutpoints
-            cp = mcvqoe.base.load_cp(fcsv)
             
             # Check cutpoints
             words = len(cp)
@@ -503,7 +660,8 @@ class measure(mcvqoe.base.Measure):
         #----------------[List of Vars to Save in Pickle File]----------------
 
         save_vars = ( 'clip_names', 'temp_data_filename',
-                      'ptt_st_dly', 'wavdir' , 'ptt_step_counts' )
+                      'ptt_st_dly', 'wavdir' , 'ptt_step_counts',
+                      'recovery_audio_file' )
 
         # Initialize clip end time for gap time calculation
         time_e = np.nan
@@ -525,6 +683,34 @@ class measure(mcvqoe.base.Measure):
 
         self.data_header, dat_format = self.csv_header_fmt(self.data_2loc_fields)
 
+        # Generate dummy values for format, these are the same for every trial
+        dummy_dat = {}
+        for _, field, _, _ in string.Formatter().parse(dat_format):
+            if field not in self.data_fields:
+                if field is None:
+                    # We got None, skip this one
+                    continue
+                # Check for array
+                m = field_index_re.match(field)
+                if not m:
+                    # Not in data fields, fill with NaN
+                    dummy_dat[field] = np.NaN
+                else:
+                    field_name = m.group("name")
+                    index = int(m.group("index"))
+                    if field_name not in dummy_dat or \
+                        len(dummy_dat[field_name]) < index + 1:
+                        dummy_dat[field_name] = (np.NaN,) * (index +1)
+            elif self.data_fields[field] is float:
+                # Float, fill with NaN
+                dummy_dat[field] = np.NaN
+            elif self.data_fields[field] is int:
+                # Int, fill with zero
+                dummy_dat[field] = 0
+            else:
+                # Something else, fill with None
+                dummy_dat[field] = None
+
         #------------------[Load In Old Data File If Given]-------------------
 
         # Recovery is untested for 2 Location
@@ -535,22 +721,8 @@ class measure(mcvqoe.base.Measure):
 
             trial_count = 0
 
-            # Compare versions
-            if('version' not in self.rec_file):
-                # No version, so it must be old, give warning
-                self.progress_update('warning',0,0,
-                                        msg='recovery file missing version')
-                
-            elif version != self.rec_file['version']:
-                # Warn on version mismatch, recovery could have issues
-                self.progress_update('warning',0,0,
-                                        msg='recovery file version mismatch!')
-
-            # Restore saved class properties
-            for k in self.rec_file:
-                if k.startswith('self.') and not k == 'self.rec_file':
-                    varname = k[len('self.'):]
-                    self.__dict__[varname] = self.rec_file[k]
+            # Restore test state from recovery file
+            self._restore_recovery()
 
             # Copy recovery variables to current test
             ptt_st_dly = self.rec_file['ptt_st_dly']
@@ -607,6 +779,9 @@ class measure(mcvqoe.base.Measure):
         # Generate temp csv name
         temp_data_filename = os.path.join(self.data_dir, f"{base_filename}_TEMP.csv")
 
+        # Get name with out path or ext, found in load_audio
+        clip_names = self._clip_names
+
         #-----------------------[Do more recovery things]-----------------------
 
         if recovery:
@@ -622,7 +797,7 @@ class measure(mcvqoe.base.Measure):
 
             for k, (new_name, old_name) in enumerate(zip(temp_data_filename, old_filename)):
                 save_dat = self.load_dat(old_name)
-                if not save_dat:
+                if save_dat is None or len(save_dat) == 0:
                     self.progress_update(
                                 'status',
                                 len(temp_data_filename),
@@ -644,33 +819,15 @@ class measure(mcvqoe.base.Measure):
                     copy_files.append((old_name, new_name))
                     # Get number of "rows" from CSV
                     clen = len(save_dat)
-                    # Initialize success with zeros
-                    success = np.zeros((2, (len(ptt_st_dly[k])*self.ptt_rep)))
-                    # Fill in success from file
-                    for p in range(clen):
-                        success[0, p] = save_dat[p]['P1_Int']
-                        success[1, p] = save_dat[p]['P2_Int']
-                    # Stop flag is computed every delay step
-                    stop_flag = np.empty(len(ptt_st_dly[k]))
-                    stop_flag[:] = np.nan
                     # Trial count is the sum of all trial counts from each file
                     trial_count = trial_count + clen
                     # Set clip start to current index
                     # If another datafile is found it will be overwritten
                     clip_start = k
-                    # Initialize k_start
+                    # 2 location tests have no stopping condition, so
+                    # intelligibility from the file is not needed
                     k_start = 0
 
-                    # Loop through data and evaluate stop condition
-                    for kk in range(self.ptt_rep, clen, self.ptt_rep):
-
-                        # Identify trials calculated at last timestep
-                        ts_ix = np.arange((kk-(self.ptt_rep)), kk)
-                        p1_intell = success[0, ts_ix]
-                        p2_intell = success[1, :]
-                        stop_flag[k] = not approx_permutation_test(p2_intell, p1_intell, tail = 'right')
-                        k_start = k_start
-
                     # Assign kk_start point for inner loop
                     if (clen == 0):
                         kk_start = 0
@@ -681,18 +838,12 @@ class measure(mcvqoe.base.Measure):
             if load_count == 0:
                 raise RuntimeError('Could not find files to load')
 
-            wav_list = os.listdir(old_wavdir)
-            num_files = len(wav_list)
-            for n, file in enumerate(wav_list):
-                self.progress_update(
-                                'status',
-                                num_files,
-                                n+1,
-                                f"Copying old test audio : {file}"
-                            )
-                new_name = os.path.join(wavdir, file)
-                old_name = os.path.join(old_wavdir, file)
-                shutil.copyfile(old_name, new_name)
+            # Trial numbers in 2 location file names count across all clips
+            self._copy_old_audio(
+                            old_wavdir,
+                            wavdir,
+                            {name: trial_count for name in clip_names},
+                        )
 
             for n, (old_name, new_name) in enumerate(copy_files):
                 self.progress_update(
@@ -706,9 +857,6 @@ class measure(mcvqoe.base.Measure):
 
         #---------[Write Transmit Audio File(s) and cutpoint File(s)]----------
 
-        # Get name with out path or ext
-        clip_names = [os.path.basename(os.path.splitext(a)[0]) for a in self.audio_files]
-
         # Write out Tx clips and cutpoints to files
         # Cutpoints are always written, they are needed for eval
         for dat, name, cp in zip(self.y, clip_names, self.cutpoints):
@@ -755,6 +903,8 @@ class measure(mcvqoe.base.Measure):
 
         # Initialize error file
         recovery_file = os.path.join(rec_data_dir, base_filename+'.pickle')
+        # Audio and cutpoints are saved separately, they are too big to pickle
+        recovery_audio_file = os.path.join(rec_data_dir, base_filename+'.npz')
 
         # Error dictionary, add version
         err_dict = {'version' : version}
@@ -766,7 +916,8 @@ class measure(mcvqoe.base.Measure):
         for i in self.__dict__:
             skip = ['no_log', 'audio_interface', 'ri',
                     'inter_word_diff', 'get_post_notes',
-                    'progress_update', 'user_check']
+                    'progress_update', 'user_check',
+                    '_bgnoise_cache', 'y', 'cutpoints']
             if (i not in skip):
                 err_dict['self.'+i] = self.__dict__[i]
 
@@ -774,6 +925,8 @@ class measure(mcvqoe.base.Measure):
         with open(recovery_file, 'wb') as pkl:
             pickle.dump(err_dict, pkl)
 
+        _save_recovery_audio(recovery_audio_file, self.y, self.cutpoints)
+
         #---------------------------[write log entry]---------------------------
 
         mcvqoe.base.pre(info=self.info, outdir=self.outdir, test_folder=self.data_dir)
@@ -783,6 +936,9 @@ class measure(mcvqoe.base.Measure):
         # Turn on LED
         self.ri.led(1, True)
 
+        # Data file, opened before the clip loop
+        data_file = None
+
         try:
 
             #---------------------[Save Time for Set Timing]----------------------
@@ -804,6 +960,10 @@ class measure(mcvqoe.base.Measure):
             with open(temp_data_filename, 'w', newline='') as csv_file:
                 csv_file.write(self.data_header)
 
+            # Keep the data file open for the whole test, rows are flushed
+            # as they are written so recovery sees every trial
+            data_file = open(temp_data_filename, 'at')
+
             for clip in range(clip_start, len(self.y)):
 
                 # Initialize clip count
@@ -903,33 +1063,8 @@ class measure(mcvqoe.base.Measure):
 
                         #-------------------------[Data Processing]---------------------------
 
-                        # Generate dummy values for format
-                        trial_dat = {}
-                        for _, field, _, _ in string.Formatter().parse(dat_format):
-                            if field not in self.data_fields:
-                                if field is None:
-                                    # We got None, skip this one
-                                    continue
-                                # Check for array
-                                m = re.match(r'(?P<name>.+)\[(?P<index>\d+)\]', field)
-                                if not m:
-                                    # Not in data fields, fill with NaN
-                                    trial_dat[field] = np.NaN
-                                else:
-                                    field_name = m.group("name")
-                                    index = int(m.group("index"))
-                                    if field_name not in trial_dat or \
-                                        len(trial_dat[field_name]) < index + 1:
-                                        trial_dat[field_name] = (np.NaN,) * (index +1)
-                            elif self.data_fields[field] is float:
-                                # Float, fill with NaN
-                                trial_dat[field] = np.NaN
-                            elif self.data_fields[field] is int:
-                                # Int, fill with zero
-                                trial_dat[field] = 0
-                            else:
-                                # Something else, fill with None
-                                trial_dat[field] = None
+                        # Start from dummy values for format
+                        trial_dat = dict(dummy_dat)
 
                         trial_dat['ptt_st_dly'] = ptt_st_dly[clip][k]
 
@@ -958,12 +1093,12 @@ class measure(mcvqoe.base.Measure):
                         trial_dat['Filename'] = clip_names[clip]
                         trial_dat['channels'] = chan_str
 
-                        with open(temp_data_filename, "at") as f:
-                            f.write(
-                                dat_format.format(
-                                    **trial_dat
-                                )
+                        data_file.write(
+                            dat_format.format(
+                                **trial_dat
                             )
+                        )
+                        data_file.flush()
             
                         #------------------------[Check Trial Limit]--------------------------
 
@@ -1005,6 +1140,10 @@ class measure(mcvqoe.base.Measure):
 
             #--------------------------[End Clip Loop]----------------------------
 
+            # Done with data file
+            data_file.close()
+            data_file = None
+
             #--------------------[Change Name of Data Files]----------------------
 
             os.rename(temp_data_filename, self.data_filename)
@@ -1016,8 +1155,13 @@ class measure(mcvqoe.base.Measure):
             #----------------------[Delete recovery file]----------------------
 
             os.remove(recovery_file)
+            os.remove(recovery_audio_file)
 
         finally:
+            # Close data file if we stopped in the middle of the test
+            if data_file is not None:
+                data_file.close()
+
             if (self.get_post_notes):
                 # Get notes
                 info = self.get_post_notes()
@@ -1040,6 +1184,9 @@ class measure(mcvqoe.base.Measure):
         
         """
         
+        # Data file for the current clip, opened in the clip loop
+        data_file = None
+        
         #------------[Try statement for end of iteration post notes]-----------
         
         try:
@@ -1057,6 +1204,7 @@ class measure(mcvqoe.base.Measure):
                 save_vars = ('clip_names', 'bad_name', 'temp_data_filenames',
                              'ptt_st_dly', 'wavdir' , 'ptt_step_counts',
                              'time_a', 'time_b', 'time_c',
+                             'recovery_audio_file',
                             )
                 
                 # Initialize clip end time for gap time calculation
@@ -1091,21 +1239,8 @@ class measure(mcvqoe.base.Measure):
         
                     trial_count = 0
         
-                    # Compare versions
-                    if('version' not in self.rec_file):
-                        # No version, so it must be old, give warning
-                        self.progress_update('warning', 0, 0,
-                                                msg='recovery file missing version')
-                    elif version != self.rec_file['version']:
-                        # Warn on version mismatch, recovery could have issues
-                        self.progress_update('warning', 0, 0,
-                                                msg='recovery file version mismatch!')
-        
-                    # Restore saved class properties
-                    for k in self.rec_file:
-                        if k.startswith('self.') and not k == 'self.rec_file':
-                            varname = k[len('self.'):]
-                            self.__dict__[varname] = self.rec_file[k]
+                    # Restore test state from recovery file
+                    self._restore_recovery()
         
                     # Copy recovery variables to current test
                     ptt_st_dly = self.rec_file['ptt_st_dly']
@@ -1166,8 +1301,8 @@ class measure(mcvqoe.base.Measure):
                 # Create wav dir
                 os.makedirs(wavdir, exist_ok=True)
                 
-                # Get name of audio clip without path or extension
-                clip_names = [os.path.basename(os.path.splitext(a)[0]) for a in self.audio_files]
+                # Get name of audio clip without path or extension, found in load_audio
+                clip_names = self._clip_names
                 
                 # Generate csv filenames and add path
                 self.data_filenames = []
@@ -1199,6 +1334,8 @@ class measure(mcvqoe.base.Measure):
                     load_count = 0
                     # List of tuples of filenames to copy
                     copy_files = []
+                    # Number of trials with data for each clip
+                    done_trials = {}
                     # Check if bad file exists
                     if os.path.exists(old_bad_name):
                         # Add to list
@@ -1206,7 +1343,7 @@ class measure(mcvqoe.base.Measure):
         
                     for k, (new_name, old_name) in enumerate(zip(temp_data_filenames, old_filenames)):
                         save_dat = self.load_dat(old_name)
-                        if not save_dat:
+                        if save_dat is None or len(save_dat) == 0:
                             self.progress_update(
                                         'status',
                                         len(temp_data_filenames),
@@ -1230,56 +1367,33 @@ class measure(mcvqoe.base.Measure):
                             clen = len(save_dat)
                             # Add old clip_count for naming audiofiles
                             clip_count = clen
-                            # Initialize success with zeros
-                            success = np.zeros((2, (len(ptt_st_dly[k])*self.ptt_rep)))
-                            # Fill in success from file
-                            for p in range(clen):
-                                success[0, p] = save_dat[p]['P1_Int']
-                                success[1, p] = save_dat[p]['P2_Int']
-                            # Stop flag is computed every delay step
-                            stop_flag = np.empty(len(ptt_st_dly[k]))
-                            stop_flag[:] = np.nan
+                            # Recorded audio up to here has data in the file
+                            done_trials[clip_names[k]] = clen
+                            # Keep data, only the last clip found is needed
+                            resume_dat = save_dat
                             # Trial count is the sum of all trial counts from each file
                             trial_count = trial_count + clen
                             # Set clip start to curren index
                             # If another datafile is found it will be overwritten
                             clip_start = k
-                            # Initialize k_start
-                            k_start = 0
-        
-                            # Loop through data and evaluate stop condition
-                            for kk in range(self.ptt_rep, clen, self.ptt_rep):
-        
-                                # Identify trials calculated at last timestep
-                                ts_ix = np.arange((kk-(self.ptt_rep)), kk)
-                                p1_intell = success[0, ts_ix]
-                                p2_intell = success[1, :]
-                                stop_flag[k] = not approx_permutation_test(p2_intell, p1_intell, tail = 'right')
-                                k_start = k_start
-        
-                            # Assign kk_start point for inner loop
-                            if (clen == 0):
-                                kk_start = 0
-                            else:
-                                kk_start = ((clen-1) % self.ptt_rep)
         
                     # Check that we loaded some data
                     if load_count == 0:
                         raise RuntimeError('Could not find files to load')
         
+                    # Find where to resume, only the clip we are resuming
+                    # needs this, clips before it are already finished
+                    k_start, kk_start, success, stop_flag = self._resume_clip(
+                                                                    clip_start,
+                                                                    resume_dat,
+                                                                    ptt_st_dly,
+                                                                    ptt_step_counts,
+                                                                )
+                    # Bisection state is saved before any clips run
+                    if self.bisect_midpoint:
+                        time_a, time_b, time_c = self._resume_bisection(ptt_st_dly[clip_start])
         
-                    wav_list = os.listdir(old_wavdir)
-                    num_files = len(wav_list)
-                    for n, file in enumerate(wav_list):
-                        self.progress_update(
-                                        'status',
-                                        num_files,
-                                        n+1,
-                                        f"Copying old test audio : {file}"
-                                    )
-                        new_name = os.path.join(wavdir, file)
-                        old_name = os.path.join(old_wavdir, file)
-                        shutil.copyfile(old_name, new_name)
+                    self._copy_old_audio(old_wavdir, wavdir, done_trials)
         
                     for n, (old_name, new_name) in enumerate(copy_files):
                         self.progress_update(
@@ -1377,6 +1491,8 @@ class measure(mcvqoe.base.Measure):
                 
                 # Initialize error file
                 recovery_file = os.path.join(rec_data_dir, base_filename+'.pickle')
+                # Audio and cutpoints are saved separately, they are too big to pickle
+                recovery_audio_file = os.path.join(rec_data_dir, base_filename+'.npz')
                  
                 # Error dictionary, add version
                 err_dict = {'version' : version}
@@ -1390,7 +1506,7 @@ class measure(mcvqoe.base.Measure):
                             'inter_word_diff', 'get_post_notes',
                             'progress_update', 'user_check',
                             'iterations', 'data_dirs',
-                            'data_files_list']
+                            'data_files_list', '_bgnoise_cache', 'y', 'cutpoints']
                     if (i not in skip):
                         err_dict['self.'+i] = self.__dict__[i]
                  
@@ -1398,6 +1514,8 @@ class measure(mcvqoe.base.Measure):
                 with open(recovery_file, 'wb') as pkl:
                     pickle.dump(err_dict, pkl)
                 
+                _save_recovery_audio(recovery_audio_file, self.y, self.cutpoints)
+                
                 #---------------------------[write log entry]---------------------------
                 
                 mcvqoe.base.pre(info=self.info, outdir=self.outdir, test_folder=self.data_dirs[itr])
@@ -1428,8 +1546,8 @@ class measure(mcvqoe.base.Measure):
                     
                     total_trials = sum(ptt_step_counts)*self.ptt_rep                
                     
-                    # Check if file is not present (not a restart)
-                    if not recovery:
+                    # Check if file is not present (not the restarted clip)
+                    if not recovery or clip != clip_start:
                         
                         #-------------------------[Write CSV Header]--------------------------
                         
@@ -1451,12 +1569,15 @@ class measure(mcvqoe.base.Measure):
                         success = np.zeros((2, (len(ptt_st_dly[clip])*self.ptt_rep)))
     
                         # Stop flag is computed every delay step
-                        stop_flag = np.empty(len(ptt_st_dly[clip]))
-                        stop_flag[:] = np.nan
+                        stop_flag = np.full(len(ptt_st_dly[clip]), np.nan)
                         
                         # Initialize clip count
                         clip_count = 0
     
+                    # Keep the data file open for the whole clip, rows are
+                    # flushed as they are written so recovery sees every trial
+                    data_file = open(temp_data_filenames[clip], 'a')
+    
                     #-----------------------[Delay Step Loop]-----------------------
                     
                     for k in range(k_start, len(ptt_st_dly[clip])):
@@ -1726,12 +1847,12 @@ class measure(mcvqoe.base.Measure):
                                 
                             #-------------------------[Save Trial Data]---------------------------
                             
-                            with open(temp_data_filenames[clip], 'a') as csv_file:
-                                csv_file.write(
-                                    dat_format.format(
-                                        **data,
-                                    )
+                            data_file.write(
+                                dat_format.format(
+                                    **data,
                                 )
+                            )
+                            data_file.flush()
                             
                             #------------------------[Check Trial Limit]--------------------------
                             
@@ -1801,6 +1922,10 @@ class measure(mcvqoe.base.Measure):
     
                     #-----------------------[End Delay Step Loop]-------------------------
                     
+                    # Done with this clip's data file
+                    data_file.close()
+                    data_file = None
+                    
                     # Reset start index so we start at the beginning
                     k_start = 0
                 
@@ -1827,9 +1952,14 @@ class measure(mcvqoe.base.Measure):
                 #----------------------[Delete recovery file]----------------------
                 
                 os.remove(recovery_file)
+                os.remove(recovery_audio_file)
         
         finally:
             
+            # Close data file if we stopped in the middle of a clip
+            if data_file is not None:
+                data_file.close()
+            
             if self.get_post_notes:
                 # Get notes
                 info = self.get_post_notes()
@@ -1847,6 +1977,202 @@ class measure(mcvqoe.base.Measure):
         # Send a list of the final data_filenames
         return self.data_files_list[-1]
 
+    def _restore_recovery(self):
+        '''
+        Restore test state from the loaded recovery file.
+
+        Saved class properties are restored and audio and cutpoints are
+        loaded. Recovery files from older versions are missing some state,
+        anything missing is found from what was restored.
+        '''
+        # Compare versions
+        if('version' not in self.rec_file):
+            # No version, so it must be old, give warning
+            self.progress_update('warning', 0, 0,
+                                    msg='recovery file missing version')
+        elif version != self.rec_file['version']:
+            # Warn on version mismatch, recovery could have issues
+            self.progress_update('warning', 0, 0,
+                                    msg='recovery file version mismatch!')
+
+        # Restore saved class properties
+        for k in self.rec_file:
+            if k.startswith('self.') and not k == 'self.rec_file':
+                varname = k[len('self.'):]
+                self.__dict__[varname] = self.rec_file[k]
+
+        # Audio and cutpoints are saved next to the recovery file, older
+        # recovery files have them in the pickle
+        if 'recovery_audio_file' in self.rec_file:
+            self.y, self.cutpoints = _load_recovery_audio(self.rec_file['recovery_audio_file'])
+
+        # Older recovery files don't have clip names, find them from audio files
+        if 'self._clip_names' not in self.rec_file:
+            self._clip_names = _clip_names(self.audio_files)
+
+    def _resume_clip(self, clip, old_dat, ptt_st_dly, ptt_step_counts):
+        '''
+        Find where to resume a clip from recovered data.
+
+        Intelligibility is filled in from the recovered data and stop flags
+        are recomputed for every completed delay step. If the stopping
+        condition was already met, the clip is finished and ptt_step_counts
+        is updated the same way the test loop does. In bisection mode the
+        delays that were run are restored into ptt_st_dly.
+
+        Parameters
+        ----------
+        clip : int
+            Index of the clip being resumed.
+        old_dat : numpy record array
+            Recovered data for the clip, as returned by load_dat.
+        ptt_st_dly : list of numpy vectors
+            PTT delays for each clip, bisection delays are updated in place.
+        ptt_step_counts : list of ints
+            Number of delay steps for each clip, updated in place.
+
+        Returns
+        -------
+        k_start : int
+            Delay step to resume at.
+        kk_start : int
+            Trial within the delay step to resume at.
+        success : numpy array
+            P1 and P2 intelligibility for the clip.
+        stop_flag : numpy vector
+            Stop flags for the clip, NaN for steps that have not been run.
+        '''
+        # Number of trials already run
+        clen = len(old_dat)
+
+        # Fill in success from file
+        success = np.zeros((2, (len(ptt_st_dly[clip])*self.ptt_rep)))
+        success[0, :clen] = old_dat['P1_Int']
+        success[1, :clen] = old_dat['P2_Int']
+        # Stop flag is computed every delay step
+        stop_flag = np.full(len(ptt_st_dly[clip]), np.nan)
+
+        # Resume at the delay step and trial after the last one in the file
+        k_start = clen // self.ptt_rep
+        kk_start = clen % self.ptt_rep
+
+        if self.bisect_midpoint:
+            # Bisection delays are found as the test runs, they are NaN in the
+            # recovery file. Restore every delay that was used, including a
+            # partially run step, so the test continues at the same delays
+            for k in range(k_start + (kk_start > 0)):
+                ptt_st_dly[clip][k] = old_dat['ptt_st_dly'][k*self.ptt_rep]
+
+        # Loop through completed delay steps and evaluate stop condition
+        for kk in range(self.ptt_rep, clen+1, self.ptt_rep):
+
+            # Index of the delay step that ends at trial kk
+            step_idx = kk//self.ptt_rep - 1
+            # P1 intelligibility for that time step
+            p1_intell = success[0, (kk-self.ptt_rep):kk]
+            # P2 intelligibility observed up to that time step
+            p2_intell = success[1, :kk]
+            stop_flag[step_idx] = not approx_permutation_test(p2_intell, p1_intell, tail = 'right')
+
+            # Check stopping condition the same way the test does
+            if (self.auto_stop and (self.cutpoints[clip][1]['End']/self.audio_interface.sample_rate)>ptt_st_dly[clip][step_idx]):
+                if (self.stop_rep<=step_idx and all(stop_flag[(step_idx-self.stop_rep):step_idx])):
+                    # Clip stopped early, update step counts
+                    ptt_step_counts[clip] = step_idx
+                    # Nothing left to run for this clip
+                    k_start = len(ptt_st_dly[clip])
+                    kk_start = 0
+                    break
+
+        return k_start, kk_start, success, stop_flag
+
+    def _resume_bisection(self, clip_dly):
+        '''
+        Rebuild the bisection interval from restored delays.
+
+        Each bisection step moves one side of the interval to the last
+        midpoint and the new midpoint is the next delay. The side that moved
+        is found from whether the delay went down or up.
+
+        Parameters
+        ----------
+        clip_dly : list of floats
+            PTT delays for the clip being resumed, NaN for delays that have
+            not been run.
+
+        Returns
+        -------
+        time_a : float or None
+            Left side of the interval, None if bisection has not started.
+        time_b : float or None
+            Right side of the interval, None if bisection has not started.
+        time_c : float or None
+            Last midpoint, None if bisection has not started.
+        '''
+        # Bisection starts at the fourth delay, the loop sets things up then
+        if len(clip_dly) < 4 or np.isnan(clip_dly[3]):
+            return None, None, None
+
+        time_a, time_b, time_c = clip_dly[:3]
+
+        for dly in clip_dly[3:]:
+            if np.isnan(dly):
+                break
+            if dly < time_c:
+                # Midpoint of time_a and time_c, right side moved
+                time_b = time_c
+            else:
+                # Midpoint of time_c and time_b, left side moved
+                time_a = time_c
+            time_c = dly
+
+        return time_a, time_b, time_c
+
+    def _copy_old_audio(self, old_wavdir, wavdir, done_trials):
+        '''
+        Copy audio from a recovered test into the new wav directory.
+
+        Recordings that have a row in the recovered data are hard linked,
+        when possible, as they will not be written again. Anything else is
+        copied. This includes Tx files and any recording made after the last
+        row was written, which the resumed test records over.
+
+        Parameters
+        ----------
+        old_wavdir : str
+            Wav directory of the recovered test.
+        wavdir : str
+            Wav directory of the new test.
+        done_trials : dict
+            Last trial number with data, keyed by clip name.
+        '''
+        with os.scandir(old_wavdir) as dir_it:
+            wav_list = [entry for entry in dir_it if entry.is_file()]
+        num_files = len(wav_list)
+        # Only update progress about every 1% of files
+        update_step = max(1, num_files//100)
+        for n, entry in enumerate(wav_list):
+            if (n+1) % update_step == 0 or (n+1) == num_files:
+                self.progress_update(
+                                'status',
+                                num_files,
+                                n+1,
+                                f"Copying old test audio : {entry.name}"
+                            )
+            new_name = os.path.join(wavdir, entry.name)
+            m = rec_audio_re.fullmatch(entry.name)
+            if m:
+                trial = int(m.group('rx') or m.group('bad'))
+                done = trial <= done_trials.get(m.group('clip'), 0)
+            else:
+                done = False
+            if done:
+                # Recorded audio is not changed, link instead of copying
+                _link_or_copy(entry.path, new_name)
+            else:
+                # Copy to leave old files alone when this one is written
+                shutil.copyfile(entry.path, new_name)
+
     def get_dly_idx(self, clip_num):
 
         # Get start of the second silence
@@ -1991,11 +2317,7 @@ class measure(mcvqoe.base.Measure):
         warn_text = ''
 
         # Extract push to talk signal (getting envelope)
-        ptt_sig = scipy.signal.filtfilt(
-                            ptt_filt,
-                            1,
-                            np.absolute(signal)
-                        )
+        ptt_sig = _apply_ptt_filter(np.absolute(signal))
 
         # Get max value
         ptt_max = np.amax(ptt_sig)
@@ -2005,17 +2327,19 @@ class measure(mcvqoe.base.Measure):
             #set warning text
             warn_text = 'Low PTT signal values. Check levels'
 
-        # Normalize levels
-        ptt_sig = ((ptt_sig*np.sqrt(2))/ptt_max)
+        # Threshold of 0.5 on the normalized signal, ptt_sig*sqrt(2)/ptt_max,
+        # scaled to signal levels so the signal doesn't need to be normalized
+        ptt_thresh = 0.5*ptt_max/np.sqrt(2)
         
-        try:
-            # Determine turn on sample
-            ptt_st_idx = np.nonzero(ptt_sig > 0.5)[0][0]
-            
+        # Determine turn on sample, argmax gives the first True
+        ptt_st_idx = np.argmax(ptt_sig > ptt_thresh)
+        
+        # Check that the signal actually crossed the threshold
+        if ptt_sig[ptt_st_idx] > ptt_thresh:
             # Convert sample index to time
             st = ptt_st_idx/self.audio_interface.sample_rate
             
-        except IndexError:
+        else:
             st = np.nan
             # Overwrite warning text (was probably set earlier)
             warn_text = 'Unable to detect PTT start. Check levels'
@@ -2055,33 +2379,27 @@ class measure(mcvqoe.base.Measure):
         Parameters
         ----------
         fname : csv file path
-            csv file to be loaded into dictionary list
+            csv file to be loaded into a record array
             
         Returns
         -------
-        dat_list : List
-            List of dictionaries containing row data(header skipped)
+        dat : numpy.recarray or None
+            Record array containing row data(header skipped). Fields can be
+            accessed by row, dat[n]['P1_Int'], or as columns, dat['P1_Int'].
+            None is returned if the file does not exist.
         
         """
 
-        # List to store each csv row(dictionaries)
-        dat_list = []
-        
         try:
-            # Read csv file and occupy list, skipping header section
-            with open(fname) as csv_f:
-                # Burn the first 3 lines in the file
-                # Fieldnames for DictReader will be populated with first line after
-                for n in range(3):
-                    csv_f.readline()
-                # Dict reader to get data
-                reader = csv.DictReader(csv_f)
-                for row in reader:
-                    dat_list.append(row)
-
-                return dat_list
+            # Read csv file, skipping header section
+            dat = pd.read_csv(fname, skiprows=3)
         except FileNotFoundError:
             return None
+        except pd.errors.EmptyDataError:
+            # No column names in the file, so no data either
+            return np.recarray((0,), dtype=[])
+
+        return dat.to_records(index=False)
     
     @staticmethod
     def included_audio_path():
@@ -2095,9 +2413,7 @@ class measure(mcvqoe.base.Measure):
 
         """
         
-        audio_path = pkg_resources.resource_filename(
-            'mcvqoe.accesstime', 'audio_clips'
-            )
+        audio_path = str(resources.files('mcvqoe.accesstime') / 'audio_clips')
         
         return audio_path
 
@@ -2127,7 +2443,7 @@ class measure(mcvqoe.base.Measure):
             # Burn the first 3 lines in the file
             for n in range(3):
                 line = csv_f.readline()
-                m = re.match(r'(?:\s*(?P<var>\w+)\s*=\s*(?P<val>\S+))|(?P<sep>-{4,})', line)
+                m = csv_top_re.match(line)
 
                 if not m:
                     # Check if this is the first line (if we have found a header)
@@ -10,7 +10,6 @@ Created on Wed Sep  8 14:26:30 2021
 import argparse
 import json
 import os
-import pkg_resources
 import re
 import warnings
 
@@ -19,11 +18,22 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from importlib import resources
 from itertools import cycle
 from scipy.optimize import curve_fit
 from scipy.stats import norm
 import mcvqoe.math
 
+# Patterns used to parse session and file names, compiled once at import
+# Session ID from old style wav directory names
+wav_sesh_re = re.compile(r'\d{2}-\w{3}-\d{4}_\d{2}-\d{2}-\d{2}_Access_.+')
+# Session ID from data file names
+sesh_id_re = re.compile(r'(capture2?_.+_\d{2}-\w{3}-\d{4}_\d{2}-\d{2}-\d{2})')
+# Talker and word from data file names
+talker_word_re = re.compile(r'([FM]\d)(_b\d{1,2}_w\d_)(\w+)(?:.csv)')
+# Sample rate from data file header
+fs_re = re.compile(r'\d+')
+
 def find_session_csvs(session_id, data_path):
     data_csvs = os.listdir(data_path)
     
@@ -32,12 +42,10 @@ def find_session_csvs(session_id, data_path):
     return list(filter(sesh_search.match, data_csvs))
 
 def default_correction_data():
-    correction_csv_path = pkg_resources.resource_filename(
-        'mcvqoe.accesstime', 'correction_data'
-        )
-    correction_csvs = pkg_resources.resource_listdir(
-        'mcvqoe.accesstime', 'correction_data'
+    correction_csv_path = str(
+        resources.files('mcvqoe.accesstime') / 'correction_data'
         )
+    correction_csvs = os.listdir(correction_csv_path)
     
     sesh_csvs = []
     for ccsv in correction_csvs:
@@ -154,9 +162,8 @@ class AccessData():
                 # wt_name = t_name.replace('Rcapture', 'capture')
                 wt_name = t_name.replace('R', '')
                 
-                # sesh_search_str = re.compile('(capture2?_.+_\d{2}-\w{3}-\d{4}_\d{2}-\d{2}-\d{2})')
-                sesh_search_str = re.compile('\d{2}-\w{3}-\d{4}_\d{2}-\d{2}-\d{2}_Access_.+')
-                sesh_search = sesh_search_str.search(wt_name)
+                # sesh_search = sesh_id_re.search(wt_name)
+                sesh_search = wav_sesh_re.search(wt_name)
                 sesh_id = sesh_search.groups()[0]
                 cp_path = os.path.join(cp_path, sesh_id)
             
@@ -192,15 +199,12 @@ class AccessData():
                 test = pd.read_csv(fname, skiprows=3)
                 
                 # Store test name as column in test
-                sesh_search_str = re.compile('(capture2?_.+_\d{2}-\w{3}-\d{4}_\d{2}-\d{2}-\d{2})')
-                sesh_search = sesh_search_str.search(session)
+                sesh_search = sesh_id_re.search(session)
                 sesh_id = sesh_search.groups()[0]
                 test['name'] = sesh_id
                 
                 # Extract talker word combo from file name
-                tw_search_str = r'([FM]\d)(_b\d{1,2}_w\d_)(\w+)(?:.csv)'
-                tw_search_var = re.compile(tw_search_str)
-                tw_search = tw_search_var.search(word_csv)
+                tw_search = talker_word_re.search(word_csv)
                 if tw_search is None:
                     raise RuntimeError(f'Unable to determine talker word from filename {word_csv}')
                 talker, bw_index, word = tw_search.groups()
@@ -220,8 +224,7 @@ class AccessData():
                     audio_files = head_file.readline()
                     sample_rate = head_file.readline()
                 
-                fs_search_var = re.compile(r'\d+')
-                fs_search = fs_search_var.search(sample_rate)
+                fs_search = fs_re.search(sample_rate)
                 if fs_search is not None:
                     fs = int(fs_search.group())
                 else:
@@ -35,6 +35,6 @@ setuptools.setup(
             'accessTime-eval=mcvqoe.accesstime.access_time_eval:main',
         ],
     },
-    python_requires='>=3.6',
+    python_requires='>=3.9',
 )
 
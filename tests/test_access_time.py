@@ -0,0 +1,418 @@
+import os
+import tempfile
+import unittest
+
+from collections import namedtuple
+
+import numpy as np
+import scipy.signal
+
+import mcvqoe.accesstime as access
+import mcvqoe.base
+from mcvqoe.accesstime import access_time
+
+
+class PttFilterTest(unittest.TestCase):
+
+    # Lengths on each side of the switch from filtfilt to overlap-add
+    ntaps = len(access_time.ptt_filt)
+    lengths = (4*ntaps, 8*ntaps, 8*ntaps + 1, 50000, 6*48000)
+
+    def ptt_like(self, n, dtype, rng):
+        # Gated tone with noise, like a PTT recording
+        x = rng.normal(0, 0.01, n)
+        on = n//3
+        x[on:] += 0.5*np.sin(2*np.pi*1000/48000*np.arange(n - on))
+        return np.absolute(x).astype(dtype)
+
+    def test_matches_filtfilt(self):
+        rng = np.random.default_rng(0)
+        for dtype in (np.float32, np.float64):
+            for n in self.lengths:
+                with self.subTest(dtype=dtype.__name__, n=n):
+                    x = self.ptt_like(n, dtype, rng)
+                    expected = scipy.signal.filtfilt(access_time.ptt_filt, 1, x)
+                    result = access_time._apply_ptt_filter(x)
+
+                    self.assertEqual(result.dtype, np.float64)
+                    self.assertEqual(result.shape, expected.shape)
+                    np.testing.assert_allclose(
+                            result,
+                            expected,
+                            rtol=0,
+                            atol=1e-12*np.max(np.abs(expected)),
+                        )
+
+    def test_shared_buffer(self):
+        rng = np.random.default_rng(1)
+        n = self.lengths[-1]
+        # Two channel recording, filter one column like process_audio does
+        rec = np.stack((
+                self.ptt_like(n, np.float32, rng),
+                self.ptt_like(n, np.float32, rng),
+            ), axis=1)
+        x = rec[:, 1]
+        x_orig = x.copy()
+
+        expected = scipy.signal.filtfilt(access_time.ptt_filt, 1, x_orig)
+        first = access_time._apply_ptt_filter(x)
+        second = access_time._apply_ptt_filter(x)
+
+        # Input must not be touched
+        np.testing.assert_array_equal(x, x_orig)
+        # Nothing carries over between calls
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_allclose(
+                first,
+                expected,
+                rtol=0,
+                atol=1e-12*np.max(np.abs(expected)),
+            )
+
+
+class ProcessPttTest(unittest.TestCase):
+
+    FakeAi = namedtuple('FakeAi', 'sample_rate')
+
+    def process(self, signal):
+        test_obj = access.measure(audio_interface=self.FakeAi(sample_rate=48000))
+        warnings = []
+        st = test_obj.process_ptt(signal, warn_func=warnings.append)
+        return st, warnings
+
+    def test_gated_tone(self):
+        rng = np.random.default_rng(2)
+        n = 48000
+        on = 12345
+        signal = rng.normal(0, 0.01, n)
+        signal[on:] += 0.5*np.sin(2*np.pi*1000/48000*np.arange(n - on))
+
+        st, warnings = self.process(signal)
+
+        # Index found by normalizing the envelope and taking the first crossing
+        ptt_sig = scipy.signal.filtfilt(access_time.ptt_filt, 1, np.absolute(signal))
+        ptt_max = np.amax(ptt_sig)
+        expected = np.nonzero(ptt_sig*np.sqrt(2)/ptt_max > 0.5)[0][0]
+
+        self.assertEqual(st, expected/48000)
+        self.assertGreater(st, on/48000 - 0.01)
+        self.assertEqual(warnings, [])
+
+    def test_start_at_zero(self):
+        # PTT is already on when the recording starts
+        st, warnings = self.process(np.ones(48000))
+
+        self.assertEqual(st, 0)
+        self.assertEqual(warnings, [])
+
+    def test_no_signal(self):
+        st, warnings = self.process(np.zeros(48000))
+
+        self.assertTrue(np.isnan(st))
+        self.assertEqual(warnings, ['Unable to detect PTT start. Check levels'])
+
+
+class ResumeClipTest(unittest.TestCase):
+
+    FakeAi = namedtuple('FakeAi', 'sample_rate')
+
+    def make_test(self):
+        test_obj = access.measure(
+                        audio_interface=self.FakeAi(sample_rate=48000),
+                        ptt_rep=16,
+                        stop_rep=2,
+                        auto_stop=True,
+                        )
+        # End of the first word is at 2 s, after all delays
+        test_obj.cutpoints = [(
+                {'Clip': np.nan, 'Start': 0, 'End': 47999},
+                {'Clip': 1, 'Start': 48000, 'End': 96000},
+            )]
+        # Ten delay steps from 1 s down
+        ptt_st_dly = [np.linspace(1, 0.1, 10)]
+        return test_obj, ptt_st_dly
+
+    def old_data(self, test_obj, ptt_st_dly, p1, p2):
+        # Write a _TEMP.csv like the test does and read it back with load_dat
+        hdr, fmt = test_obj.csv_header_fmt()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, 'test_TEMP.csv')
+            with open(fname, 'w', newline='') as csv_file:
+                csv_file.write('Audiofile = test.wav\n')
+                csv_file.write('fs = 48000\n')
+                csv_file.write('----------------\n')
+                csv_file.write(hdr)
+            with open(fname, 'a') as csv_file:
+                for n, (p1_int, p2_int) in enumerate(zip(p1, p2)):
+                    csv_file.write(fmt.format(
+                                PTT_time=0.5,
+                                PTT_start=0.531,
+                                ptt_st_dly=ptt_st_dly[0][n//test_obj.ptt_rep],
+                                P1_Int=p1_int,
+                                P2_Int=p2_int,
+                                m2e_latency=0.031,
+                                channels='(rx_voice;PTT_signal)',
+                                TimeStart='12:00:00',
+                                TimeEnd='12:00:04',
+                                TimeGap='0:0:4.000',
+                            ))
+            return test_obj.load_dat(fname)
+
+    def test_partial_step(self):
+        test_obj, ptt_st_dly = self.make_test()
+        ptt_step_counts = [10]
+        # Two full steps and part of a third, P1 never intelligible so the
+        # test can't stop
+        clen = 2*16 + 4
+        old_dat = self.old_data(test_obj, ptt_st_dly, np.zeros(clen), np.ones(clen))
+
+        k_start, kk_start, success, stop_flag = test_obj._resume_clip(
+                                                        0,
+                                                        old_dat,
+                                                        ptt_st_dly,
+                                                        ptt_step_counts,
+                                                    )
+
+        self.assertEqual(k_start, 2)
+        self.assertEqual(kk_start, 4)
+        # Next trial is written at index clen, which must fit
+        self.assertEqual(success.shape, (2, 10*16))
+        np.testing.assert_array_equal(success[0, :clen], 0)
+        np.testing.assert_array_equal(success[1, :clen], 1)
+        # Flags for completed steps only
+        np.testing.assert_array_equal(stop_flag[:2], [False, False])
+        self.assertTrue(np.all(np.isnan(stop_flag[2:])))
+        self.assertEqual(ptt_step_counts, [10])
+
+    def test_step_boundary(self):
+        test_obj, ptt_st_dly = self.make_test()
+        ptt_step_counts = [10]
+        clen = 16
+        old_dat = self.old_data(test_obj, ptt_st_dly, np.zeros(clen), np.ones(clen))
+
+        k_start, kk_start, _, stop_flag = test_obj._resume_clip(
+                                                    0,
+                                                    old_dat,
+                                                    ptt_st_dly,
+                                                    ptt_step_counts,
+                                                )
+
+        self.assertEqual((k_start, kk_start), (1, 0))
+        # The last completed step gets a flag too
+        self.assertFalse(np.isnan(stop_flag[0]))
+
+    def test_already_stopped(self):
+        test_obj, ptt_st_dly = self.make_test()
+        ptt_step_counts = [10]
+        # P1 matches P2 so every step flags, stop is met at step 2
+        clen = 3*16
+        old_dat = self.old_data(test_obj, ptt_st_dly, np.ones(clen), np.ones(clen))
+
+        k_start, kk_start, _, stop_flag = test_obj._resume_clip(
+                                                    0,
+                                                    old_dat,
+                                                    ptt_st_dly,
+                                                    ptt_step_counts,
+                                                )
+
+        # Clip is done, nothing left to run
+        self.assertEqual(k_start, len(ptt_st_dly[0]))
+        self.assertEqual(kk_start, 0)
+        self.assertEqual(ptt_step_counts, [2])
+        np.testing.assert_array_equal(stop_flag[:3], [True, True, True])
+
+    def test_bisection(self):
+        test_obj, _ = self.make_test()
+        test_obj.bisect_midpoint = True
+        # Delays the test ran, set up the same way run_1loc does, bisection
+        # moves right, left, right
+        w_end = 96000/48000 + 0.001
+        time_a, time_b, time_c = 0, w_end, np.mean([0, w_end])
+        run_dly = [time_a, time_b, time_c]
+        for move_right in (True, False, True):
+            if move_right:
+                time_b = time_c
+            else:
+                time_a = time_c
+            time_c = np.mean([time_a, time_b])
+            run_dly.append(time_c)
+        # Delays in the recovery file, saved before the clip loop
+        ptt_st_dly = [run_dly[:3] + [np.nan]*5]
+        ptt_step_counts = [8]
+        # Five full steps and part of the sixth
+        clen = 5*16 + 3
+        old_dat = self.old_data(test_obj, [run_dly], np.zeros(clen), np.ones(clen))
+
+        k_start, kk_start, _, _ = test_obj._resume_clip(
+                                            0,
+                                            old_dat,
+                                            ptt_st_dly,
+                                            ptt_step_counts,
+                                        )
+
+        self.assertEqual((k_start, kk_start), (5, 3))
+        # Delays that were run are restored, the partial step keeps its delay
+        np.testing.assert_array_equal(ptt_st_dly[0][:6], run_dly)
+        self.assertTrue(np.all(np.isnan(ptt_st_dly[0][6:])))
+        # Interval is where the test left it
+        self.assertEqual(
+                test_obj._resume_bisection(ptt_st_dly[0]),
+                (time_a, time_b, time_c),
+            )
+
+    def test_bisection_not_started(self):
+        test_obj, _ = self.make_test()
+        test_obj.bisect_midpoint = True
+        ptt_st_dly = [[0, 2.001, 1.0005] + [np.nan]*5]
+
+        # The test loop sets up bisection at the fourth step
+        self.assertEqual(
+                test_obj._resume_bisection(ptt_st_dly[0]),
+                (None, None, None),
+            )
+
+
+class CopyOldAudioTest(unittest.TestCase):
+
+    # Files left by a test that stopped after writing two rows for 'clip'
+    old_files = (
+            'Tx_clip.wav',
+            'Rx1_clip.wav',
+            'Rx2_clip.wav',
+            'Bad3_r0_clip.wav',
+            # Recorded but the test stopped before writing the row
+            'Rx3_clip.wav',
+            # Clip with no data
+            'Rx1_other.wav',
+        )
+
+    def test_resumed_write(self):
+        test_obj = access.measure(progress_update=lambda *args, **kwargs: True)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_wavdir = os.path.join(tmp_dir, 'old')
+            wavdir = os.path.join(tmp_dir, 'new')
+            os.makedirs(old_wavdir)
+            os.makedirs(wavdir)
+
+            for name in self.old_files:
+                with open(os.path.join(old_wavdir, name), 'w') as f:
+                    f.write(f'old {name}')
+
+            test_obj._copy_old_audio(old_wavdir, wavdir, {'clip': 2})
+
+            self.assertEqual(sorted(os.listdir(wavdir)), sorted(self.old_files))
+
+            # Resumed test records over the files it has no data for
+            for name in ('Tx_clip.wav', 'Rx3_clip.wav', 'Bad3_r0_clip.wav', 'Rx1_other.wav'):
+                with self.subTest(name=name):
+                    self.assertFalse(os.path.samefile(
+                                        os.path.join(old_wavdir, name),
+                                        os.path.join(wavdir, name),
+                                    ))
+                    with open(os.path.join(wavdir, name), 'w') as f:
+                        f.write('new')
+
+            # Old test directory is unchanged
+            for name in self.old_files:
+                with self.subTest(name=name):
+                    with open(os.path.join(old_wavdir, name)) as f:
+                        self.assertEqual(f.read(), f'old {name}')
+
+
+class RestoreRecoveryTest(unittest.TestCase):
+
+    def old_rec_file(self):
+        # Recovery file from before clip names were saved, audio and
+        # cutpoints are in the pickle
+        return {
+                'version': access.version,
+                'self.audio_files': ['clips/F1_b9_w1_bed.wav', 'F3_b31_w2_law.wav'],
+                'self.y': [np.zeros(10), np.zeros(10)],
+                'self.cutpoints': [(), ()],
+            }
+
+    def test_missing_clip_names(self):
+        test_obj = access.measure()
+        test_obj.rec_file = self.old_rec_file()
+
+        test_obj._restore_recovery()
+
+        self.assertEqual(test_obj._clip_names, ['F1_b9_w1_bed', 'F3_b31_w2_law'])
+
+    def test_saved_clip_names(self):
+        test_obj = access.measure()
+        test_obj.rec_file = self.old_rec_file()
+        test_obj.rec_file['self._clip_names'] = ['saved_1', 'saved_2']
+
+        test_obj._restore_recovery()
+
+        self.assertEqual(test_obj._clip_names, ['saved_1', 'saved_2'])
+
+
+class LoadAudioNoiseTest(unittest.TestCase):
+
+    def check_noise(self, noise_len):
+        test_obj = access.measure(bgnoise_snr=20)
+        # One clip is enough
+        test_obj.audio_files = test_obj.audio_files[:1]
+        _, _, audio, _ = access_time._read_clip(test_obj.audio_files[0])
+
+        rng = np.random.default_rng(3)
+        noise = rng.normal(0, 0.1, noise_len).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_obj.bgnoise_file = os.path.join(tmp_dir, 'noise.wav')
+            mcvqoe.base.audio_write(test_obj.bgnoise_file, 48000, noise)
+            test_obj.load_audio()
+
+        # Noise scaled to the clip level, repeated to the clip length
+        _, nf, noise_level = test_obj._bgnoise_cache
+        sig_level = access_time.active_speech_level(audio, 48000)
+        noise_gain = sig_level - (test_obj.bgnoise_snr + noise_level)
+        noise_scaled = nf * (10 ** (noise_gain / 20))
+        expected = (audio + np.resize(noise_scaled, audio.size)).astype(np.float32)
+
+        self.assertEqual(len(test_obj.y), 1)
+        self.assertEqual(test_obj.y[0].dtype, np.float32)
+        np.testing.assert_array_equal(test_obj.y[0], expected)
+
+    def test_short_noise(self):
+        self.check_noise(4800)
+
+    def test_long_noise(self):
+        self.check_noise(10*48000)
+
+
+class RecoveryAudioTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        test_obj = access.measure()
+        test_obj.load_audio()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, 'rec.npz')
+            access_time._save_recovery_audio(fname, test_obj.y, test_obj.cutpoints)
+            y, cutpoints = access_time._load_recovery_audio(fname)
+
+        self.assertEqual(len(y), len(test_obj.y))
+        for new, old in zip(y, test_obj.y):
+            self.assertEqual(new.dtype, old.dtype)
+            np.testing.assert_array_equal(new, old)
+
+        # Compare as strings so NaN clips match
+        self.assertEqual(str(cutpoints), str(test_obj.cutpoints))
+        for cp in cutpoints:
+            for word in cp:
+                self.assertIsInstance(word['Start'], int)
+                self.assertIsInstance(word['End'], int)
+
+    def test_missing_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, 'missing.npz')
+            with self.assertRaises(RuntimeError):
+                access_time._load_recovery_audio(fname)
+
+
+if __name__ == "__main__":
+    unittest.main()